@@ -1,7 +1,14 @@
+import atexit
+import hashlib
+import json
 import logging
 import os
+import queue
+import signal
 import time
+from email.utils import formatdate
 from http import HTTPStatus
+from logging.handlers import QueueHandler, QueueListener
 
 import requests
 from dotenv import load_dotenv
@@ -15,29 +22,33 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TOKEN_NAMES = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD = 600
+ERROR_REPEAT_PERIOD = 3600
+SENT_ERRORS_LIMIT = 32
+TELEGRAM_MESSAGE_LIMIT = 4096
+REQUEST_TIMEOUT = (5, 60)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+REQUEST_HEADERS = {**HEADERS, 'If-Modified-Since': ''}
+PARAMS = {'from_date': 0}
+STATE_FILE = os.getenv('STATE_FILE', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'homework_state.json'
+))
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+STATUS_MESSAGE = 'Изменился статус проверки работы "{}". {}'.format
+SENT_ERRORS = {}
 
 
 def check_tokens() -> None:
     """Проверяет доступность переменных окружения."""
-    tokens_dict = {
-        'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
-        'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
-        'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID
-    }
-    check = []
-    for name_token, token in tokens_dict.items():
-        if not token:
-            check.append(name_token)
+    check = [name for name in TOKEN_NAMES if not globals()[name]]
     if check:
         message = f'Отсутствует переменная(ые) окружения: {", ".join(check)}'
         logging.critical(message)
@@ -48,31 +59,49 @@ def send_message(bot: TeleBot, message: str) -> bool:
     """Отправляет сообщение в Telegram чат."""
     try:
         bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-    except ApiException as error:
-        logging.error(f'Сбой при отправке сообщения: {error}')
+    except (ApiException, requests.RequestException) as error:
+        logging.error('Сбой при отправке сообщения: %s', error)
         return False
-    logging.debug(f'Сообщение отправлено - {message}')
+    logging.debug('Сообщение отправлено - %s', message)
     return True
 
 
+def send_error(bot: TeleBot, message: str) -> None:
+    """Отправляет сообщение об ошибке, если оно не отправлялось недавно."""
+    now = time.monotonic()
+    sent_at = SENT_ERRORS.get(message)
+    if sent_at is not None and now - sent_at < ERROR_REPEAT_PERIOD:
+        return
+    if send_message(bot, message):
+        SENT_ERRORS.pop(message, None)
+        SENT_ERRORS[message] = now
+        if len(SENT_ERRORS) > SENT_ERRORS_LIMIT:
+            SENT_ERRORS.pop(next(iter(SENT_ERRORS)))
+
+
 def get_api_answer(timestamp: int) -> dict:
     """Делает запрос к эндпоинту API-сервиса."""
-    api_params = {
-        'url': ENDPOINT,
-        'headers': HEADERS,
-        'params': {'from_date': timestamp}
-    }
-    logging.info(
-        ('Запрос к эндпоинту {url} с параметрами: {headers} и {params}'
-         .format(**api_params))
-    )
+    PARAMS['from_date'] = timestamp
+    logging.info('Запрос к эндпоинту %s с параметрами %s', ENDPOINT, PARAMS)
+    REQUEST_HEADERS['If-Modified-Since'] = formatdate(timestamp, usegmt=True)
     try:
-        response = requests.get(**api_params)
-    except requests.RequestException:
-        raise ConnectionError(
-            'Ошибка при запросе к эндпоинту {url} с параметрами: {headers} и '
-            '{params}'.format(**api_params)
+        response = requests.get(
+            ENDPOINT,
+            headers=REQUEST_HEADERS,
+            params=PARAMS,
+            timeout=REQUEST_TIMEOUT
         )
+    except requests.ReadTimeout:
+        logging.warning('Превышено время ожидания ответа от %s', ENDPOINT)
+        return {'homeworks': [], 'current_date': timestamp}
+    except requests.RequestException as error:
+        raise ConnectionError(
+            f'Ошибка при запросе к эндпоинту {ENDPOINT} с параметрами '
+            f'{PARAMS}: {type(error).__name__}'
+        ) from error
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        logging.debug('Статусы домашних работ не изменились')
+        return {'homeworks': [], 'current_date': timestamp}
     if response.status_code != HTTPStatus.OK:
         raise InvalidResponseCode(f'Некорректный статус код: '
                                   f'{response.reason}')
@@ -81,11 +110,12 @@ def get_api_answer(timestamp: int) -> dict:
 
 def check_response(response: dict) -> list:
     """Проверяет ответ API на корректность."""
-    if not isinstance(response, dict):
-        raise TypeError('Ответ API не словарь')
-    if 'homeworks' not in response:
-        raise KeyError('Отсутствует ключ "homeworks"')
-    list_home_works = response.get('homeworks')
+    try:
+        list_home_works = response['homeworks']
+    except TypeError:
+        raise TypeError('Ответ API не словарь') from None
+    except KeyError:
+        raise KeyError('Отсутствует ключ "homeworks"') from None
     if not isinstance(list_home_works, list):
         raise TypeError('В ответе API нет списка домашних работ')
     return list_home_works
@@ -93,45 +123,116 @@ def check_response(response: dict) -> list:
 
 def parse_status(homework: dict) -> str:
     """Извлекает из информации о конкретной домашней работе ее статус."""
-    try:
-        homework_name = homework['homework_name']
-        status = homework['status']
-    except KeyError as error:
-        raise KeyError(f'В ответе API нет значения {error}')
-    if status not in HOMEWORK_VERDICTS:
+    homework_name = homework.get('homework_name')
+    if homework_name is None:
+        raise KeyError("В ответе API нет значения 'homework_name'")
+    status = homework.get('status')
+    if status is None:
+        raise KeyError("В ответе API нет значения 'status'")
+    verdict = HOMEWORK_VERDICTS.get(status)
+    if verdict is None:
         raise HomeworkVerdictNotFound(
-            f'Неверный статус домашней работы {homework["status"]}'
+            f'Неверный статус домашней работы {status}'
         )
-    verdict = HOMEWORK_VERDICTS.get(status)
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return STATUS_MESSAGE(homework_name, verdict)
+
+
+def parse_statuses(homeworks: list) -> list:
+    """Собирает статусы домашних работ в сообщения в пределах лимита."""
+    latest = {}
+    for homework in homeworks:
+        latest.setdefault(homework.get('homework_name'), homework)
+    messages = []
+    for homework in latest.values():
+        status = parse_status(homework)
+        if (messages and len(messages[-1]) + len(status) + 2
+                <= TELEGRAM_MESSAGE_LIMIT):
+            messages[-1] += f'\n\n{status}'
+            continue
+        messages.extend(
+            status[start:start + TELEGRAM_MESSAGE_LIMIT]
+            for start in range(0, len(status), TELEGRAM_MESSAGE_LIMIT)
+        )
+    return messages
+
+
+def send_report(bot: TeleBot, messages: list, sent: int) -> int:
+    """Отправляет части отчёта, начиная с первой неотправленной."""
+    for message in messages[sent:]:
+        if not send_message(bot, message):
+            break
+        sent += 1
+    return sent
+
+
+def load_state() -> tuple:
+    """Загружает последний отправленный статус и метку времени с диска."""
+    try:
+        with open(STATE_FILE, encoding='utf-8') as file:
+            state = json.load(file)
+        last_status, timestamp = state['last_status'], state['timestamp']
+    except FileNotFoundError:
+        return '', 1
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        logging.warning('Не удалось прочитать состояние бота: %s', error)
+        return '', 1
+    if not isinstance(last_status, str) or not isinstance(timestamp, int):
+        logging.warning('Некорректное состояние бота в %s', STATE_FILE)
+        return '', 1
+    return last_status, timestamp
+
+
+def save_state(last_status: str, timestamp: int) -> None:
+    """Атомарно сохраняет последний статус и метку времени на диск."""
+    tmp_path = f'{STATE_FILE}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'last_status': last_status, 'timestamp': timestamp},
+                      file)
+        os.replace(tmp_path, STATE_FILE)
+    except OSError as error:
+        logging.error('Не удалось сохранить состояние бота: %s', error)
+
+
+def stop_bot(signum: int, frame) -> None:
+    """Завершает работу бота по сигналу остановки."""
+    raise SystemExit(0)
 
 
 def main():
     """Основная логика работы бота."""
     logging.error('Бот запущен')
     check_tokens()
-    last_status = ''
+    last_status, timestamp = state = load_state()
+    report_hash, report_sent = '', 0
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = 1
     while True:
         try:
             response = get_api_answer(timestamp)
             homeworks = check_response(response)
             if not homeworks:
                 logging.debug('Получен пустой список домашних работ')
-                continue
-            status_home_work = parse_status(homeworks[0])
-            if (status_home_work != last_status
-                    and send_message(bot, status_home_work)):
-                last_status = status_home_work
                 timestamp = response.get('current_date', timestamp)
+            else:
+                messages = parse_statuses(homeworks)
+                status_hash = hashlib.blake2b(
+                    '\n\n'.join(messages).encode(), digest_size=8
+                ).hexdigest()
+                if status_hash != last_status:
+                    if status_hash != report_hash:
+                        report_hash, report_sent = status_hash, 0
+                    report_sent = send_report(bot, messages, report_sent)
+                    if report_sent == len(messages):
+                        last_status = status_hash
+                        timestamp = response.get('current_date', timestamp)
+            if (last_status, timestamp) != state:
+                state = (last_status, timestamp)
+                save_state(*state)
         except Exception as error:
             message = f'Сбой в работе программы: {error}'
             logging.error(message)
-            if last_status != message and send_message(bot, message):
-                last_status = message
-        finally:
-            time.sleep(RETRY_PERIOD)
+            send_error(bot, message)
+        time.sleep(RETRY_PERIOD)
 
 
 if __name__ == '__main__':
@@ -144,5 +245,14 @@ if __name__ == '__main__':
     )
     file_handler.setFormatter(formatter)
     stream_handler.setFormatter(formatter)
-    logging.basicConfig(handlers=[file_handler, stream_handler])
+    log_queue = queue.Queue()
+    listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(handlers=[queue_handler])
+    signal.signal(signal.SIGTERM, stop_bot)
     main()
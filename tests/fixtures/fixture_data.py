@@ -46,3 +46,17 @@ def data_with_new_hw_status(random_timestamp):
         ],
         'current_date': random_timestamp
     }
+
+
+@pytest.fixture
+def sent_errors(monkeypatch, homework_module):
+    sent_errors = {}
+    monkeypatch.setattr(homework_module, 'SENT_ERRORS', sent_errors)
+    return sent_errors
+
+
+@pytest.fixture(autouse=True)
+def state_file(monkeypatch, tmp_path, homework_module):
+    state_file = tmp_path / 'homework_state.json'
+    monkeypatch.setattr(homework_module, 'STATE_FILE', str(state_file))
+    return state_file
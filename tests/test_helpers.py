@@ -0,0 +1,276 @@
+import signal
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+import telebot
+
+import tests.check_utils as check_utils
+
+
+class CountingBot(check_utils.MockTelegramBot):
+    def __init__(self, *args, fail=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail = fail
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.fail:
+            raise requests.ConnectionError('Telegram недоступен')
+        self.sent.append(text)
+
+
+def run_main(monkeypatch, homework_module, bot, iterations=1):
+    """Run `main()` for the given number of loop iterations."""
+    calls = []
+
+    def sleep_to_interrupt(secs):
+        calls.append(secs)
+        if len(calls) >= iterations:
+            raise check_utils.BreakInfiniteLoop('break')
+
+    monkeypatch.setattr(time, 'sleep', sleep_to_interrupt)
+    monkeypatch.setattr(homework_module, 'TeleBot', lambda *args, **kwargs: bot)
+    with pytest.raises(check_utils.BreakInfiniteLoop):
+        homework_module.main()
+
+
+class TestSendError:
+    def test_same_error_within_period_is_skipped(
+            self, homework_module, sent_errors
+    ):
+        bot = CountingBot()
+        homework_module.send_error(bot, 'error')
+        homework_module.send_error(bot, 'error')
+        assert bot.sent == ['error'], (
+            'Повторная ошибка в пределах `ERROR_REPEAT_PERIOD` '
+            'не должна отправляться.'
+        )
+
+    def test_same_error_after_period_is_sent(
+            self, monkeypatch, homework_module, sent_errors
+    ):
+        bot = CountingBot()
+        homework_module.send_error(bot, 'error')
+        now = time.monotonic() + homework_module.ERROR_REPEAT_PERIOD
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        homework_module.send_error(bot, 'error')
+        assert bot.sent == ['error', 'error']
+
+    def test_failed_send_is_not_remembered(
+            self, homework_module, sent_errors
+    ):
+        homework_module.send_error(CountingBot(fail=True), 'error')
+        assert 'error' not in sent_errors
+        bot = CountingBot()
+        homework_module.send_error(bot, 'error')
+        assert bot.sent == ['error']
+
+    def test_oldest_error_is_evicted(self, homework_module, sent_errors):
+        bot = CountingBot()
+        limit = homework_module.SENT_ERRORS_LIMIT
+        for number in range(limit + 1):
+            homework_module.send_error(bot, f'error {number}')
+        assert len(sent_errors) == limit
+        assert 'error 0' not in sent_errors
+        assert f'error {limit}' in sent_errors
+
+
+class TestMainErrors:
+    def test_connection_errors_differing_in_address_are_sent_once(
+            self, monkeypatch, homework_module, sent_errors
+    ):
+        addresses = iter(('0x7fa525177950', '0x7fa525177d50'))
+
+        def mock_request_get_with_exception(*args, **kwargs):
+            raise requests.ConnectionError(
+                'Failed to establish a new connection: '
+                f'<HTTPSConnection object at {next(addresses)}>'
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_request_get_with_exception)
+        bot = CountingBot()
+        run_main(monkeypatch, homework_module, bot, iterations=2)
+        assert len(bot.sent) == 1, (
+            'Одинаковые сбои соединения должны отправляться один раз.'
+        )
+
+
+class TestGetApiAnswer:
+    def test_connection_error_hides_token(
+            self, monkeypatch, current_timestamp, homework_module
+    ):
+        headers = {'Authorization': 'OAuth secret-token'}
+        monkeypatch.setattr(homework_module, 'HEADERS', headers)
+        monkeypatch.setattr(
+            homework_module, 'REQUEST_HEADERS',
+            {**headers, 'If-Modified-Since': ''}
+        )
+
+        def mock_request_get_with_exception(*args, **kwargs):
+            raise requests.ConnectionError('Something wrong')
+
+        monkeypatch.setattr(requests, 'get', mock_request_get_with_exception)
+        try:
+            homework_module.get_api_answer(current_timestamp)
+        except ConnectionError as error:
+            assert 'secret-token' not in str(error), (
+                'Текст ошибки не должен содержать токен.'
+            )
+            assert isinstance(error.__cause__, requests.ConnectionError)
+        else:
+            raise AssertionError('Ожидалось исключение `ConnectionError`.')
+
+    def test_not_modified_returns_empty_answer(
+            self, monkeypatch, current_timestamp, homework_module
+    ):
+        class NotModifiedResponse(check_utils.MockResponseGET):
+            def json(self):
+                raise AssertionError(
+                    'Ответ 304 не должен разбираться через `json()`.'
+                )
+
+        def mock_response_get(*args, **kwargs):
+            assert 'If-Modified-Since' in kwargs['headers']
+            return NotModifiedResponse(http_status=HTTPStatus.NOT_MODIFIED)
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        assert homework_module.get_api_answer(current_timestamp) == {
+            'homeworks': [], 'current_date': current_timestamp
+        }
+
+
+class TestParseStatuses:
+    def test_keeps_latest_status_per_homework(self, homework_module):
+        messages = homework_module.parse_statuses([
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'rejected'},
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+        ])
+        assert messages == [
+            homework_module.parse_status(
+                {'homework_name': 'hw1', 'status': 'approved'}
+            ) + '\n\n' + homework_module.parse_status(
+                {'homework_name': 'hw2', 'status': 'rejected'}
+            )
+        ]
+
+    def test_splits_messages_by_telegram_limit(self, homework_module):
+        homeworks = [
+            {'homework_name': f'{"x" * 100}_{number}', 'status': 'approved'}
+            for number in range(40)
+        ]
+        messages = homework_module.parse_statuses(homeworks)
+        limit = homework_module.TELEGRAM_MESSAGE_LIMIT
+        assert len(messages) > 1
+        assert all(len(message) <= limit for message in messages)
+        assert '\n\n'.join(messages) == '\n\n'.join(
+            homework_module.parse_status(homework) for homework in homeworks
+        )
+
+    def test_splits_single_long_status(self, homework_module):
+        homework = {'homework_name': 'x' * 5000, 'status': 'approved'}
+        messages = homework_module.parse_statuses([homework])
+        limit = homework_module.TELEGRAM_MESSAGE_LIMIT
+        assert all(len(message) <= limit for message in messages)
+        assert ''.join(messages) == homework_module.parse_status(homework)
+
+
+class FailingOnceBot(CountingBot):
+    def __init__(self, *args, fail_on=2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise telebot.apihelper.ApiException(
+                'Telegram недоступен', 'send_message', 500
+            )
+        super().send_message(chat_id=chat_id, text=text, **kwargs)
+
+
+class TestMainReport:
+    def test_resumes_report_from_first_unsent_part(
+            self, monkeypatch, random_timestamp, homework_module
+    ):
+        homeworks = [
+            {'homework_name': f'{"x" * 100}_{number}', 'status': 'approved'}
+            for number in range(40)
+        ]
+        messages = homework_module.parse_statuses(homeworks)
+        assert len(messages) > 1
+
+        def mock_response_get(*args, **kwargs):
+            return check_utils.MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                data={'homeworks': homeworks,
+                      'current_date': random_timestamp},
+                **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        bot = FailingOnceBot()
+        run_main(monkeypatch, homework_module, bot, iterations=2)
+        assert bot.sent == messages, (
+            'После сбоя отправка отчёта должна продолжаться с первой '
+            'неотправленной части без повторов.'
+        )
+        assert homework_module.load_state()[1] == random_timestamp
+
+
+class TestState:
+    DEFAULT_STATE = ('', 1)
+
+    def test_missing_file(self, homework_module, state_file):
+        assert homework_module.load_state() == self.DEFAULT_STATE
+
+    def test_corrupt_json(self, homework_module, state_file):
+        state_file.write_text('{bad', encoding='utf-8')
+        assert homework_module.load_state() == self.DEFAULT_STATE
+
+    @pytest.mark.parametrize('content', (
+        '{"last_status": null, "timestamp": "abc"}',
+        '{"last_status": "abc", "timestamp": "123"}',
+        '{"last_status": 1, "timestamp": 123}',
+        '{"timestamp": 123}',
+        '[]',
+    ))
+    def test_wrong_types(self, homework_module, state_file, content):
+        state_file.write_text(content, encoding='utf-8')
+        assert homework_module.load_state() == self.DEFAULT_STATE
+
+    def test_save_then_load(self, homework_module, state_file):
+        homework_module.save_state('abc', 1000198000)
+        assert homework_module.load_state() == ('abc', 1000198000)
+        assert [path.name for path in state_file.parent.iterdir()] == [
+            state_file.name
+        ]
+
+
+class TestStopBot:
+    def test_stop_bot_exits_with_zero(self, homework_module):
+        with pytest.raises(SystemExit) as exit_info:
+            homework_module.stop_bot(signal.SIGTERM, None)
+        assert exit_info.value.code == 0
+
+    def test_system_exit_during_sleep_stops_main(
+            self, monkeypatch, homework_module
+    ):
+        def sleep_with_sigterm(secs):
+            homework_module.stop_bot(signal.SIGTERM, None)
+
+        monkeypatch.setattr(time, 'sleep', sleep_with_sigterm)
+        monkeypatch.setattr(
+            homework_module, 'TeleBot', lambda *args, **kwargs: CountingBot()
+        )
+        monkeypatch.setattr(
+            requests, 'get', lambda *args, **kwargs: (
+                check_utils.MockResponseGET(random_timestamp=1000198000)
+            )
+        )
+        with pytest.raises(SystemExit) as exit_info:
+            homework_module.main()
+        assert exit_info.value.code == 0